@@ -15,6 +15,8 @@
 # ==============================================================================
 """Tests for haiku._src.conformance.bfloat16_test."""
 
+import unittest
+
 from absl.testing import absltest
 from haiku._src import test_utils
 from haiku._src.integration import common
@@ -23,6 +25,7 @@ from haiku._src.typing import DType, Shape  # pylint: disable=g-multiple-import
 import jax.numpy as jnp
 
 
+@unittest.skipUnless(common.ON_TPU, 'bfloat16 only supported on TPU')
 class Bfloat16Test(common.DTypeTestCase):
 
   @test_utils.combined_named_parameters(descriptors.ALL_MODULES)
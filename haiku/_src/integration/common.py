@@ -15,13 +15,54 @@
 # ==============================================================================
 """Common utilities."""
 
+import functools
+
 from absl.testing import parameterized
 import haiku as hk
 from haiku._src.integration import descriptors
 from haiku._src.typing import DType, Shape  # pylint: disable=g-multiple-import
 import jax
+from jax import lax
 import jax.numpy as jnp
 
+ON_TPU = jax.local_devices()[0].platform == 'tpu'
+
+_RNG = jax.random.PRNGKey(42)
+
+_F32_NUM = jnp.dtype(jnp.float32).num
+_I32_NUM = jnp.dtype(jnp.int32).num
+
+
+@functools.lru_cache(maxsize=None)
+def _jitted_fns(module_fn: descriptors.ModuleFn, test_dtype: DType):
+  """Returns jitted init/apply functions, cached across test cases."""
+  def g(x):
+    mod = module_fn()
+    return mod(x)
+
+  f = hk.transform_with_state(g)
+
+  # Create state in f32 to start and cast f32 to test_dtype in the same
+  # computation, so the f32 copy never needs to be materialized.
+  # NOTE: We need to do this since some initializers (e.g. random.uniform) do
+  # not support <32bit dtypes.
+  def init_and_cast(rng, x):
+    f32_to_test_dtype = (
+        lambda v: (lax.convert_element_type(v, test_dtype)
+                   if v.dtype.num == _F32_NUM else v))
+    return jax.tree_map(f32_to_test_dtype, f.init(rng, x))
+
+  # Applies the module num_steps times (threading state) in one computation.
+  def apply_steps(params, state, rng, x, num_steps):
+    def step(state, _):
+      y, state = f.apply(params, state, rng, x)
+      return state, y
+
+    state, ys = lax.scan(step, state, jnp.arange(num_steps))
+    return ys, state
+
+  return jax.jit(init_and_cast), jax.jit(apply_steps, static_argnums=4)
+
 
 class DTypeTestCase(parameterized.TestCase):
   """Common base class for dtype tests."""
@@ -34,40 +75,31 @@ class DTypeTestCase(parameterized.TestCase):
       input_dtype: DType,
   ):
     """Checks that modules accepting float32 input_dtype output test_dtype."""
-    if jax.local_devices()[0].platform != 'tpu':
+    if not ON_TPU:
       self.skipTest('bfloat16 only supported on TPU')
 
     if input_dtype != jnp.float32:
       self.skipTest('Skipping module without float32 input')
 
-    rng = jax.random.PRNGKey(42)
-
-    def g(x):
-      mod = module_fn()
-      return mod(x)
+    init_fn, apply_fn = _jitted_fns(module_fn, test_dtype)
 
-    init_fn, apply_fn = hk.transform_with_state(g)
-
-    # Create state in f32 to start.
-    # NOTE: We need to do this since some initializers (e.g. random.uniform) do
-    # not support <32bit dtypes.
-    x = jax.random.uniform(rng, shape)
-    params, state = init_fn(rng, x)
-
-    # Cast f32 to test_dtype.
-    f32_to_test_dtype = (
-        lambda v: v.astype(test_dtype) if v.dtype == jnp.float32 else v)
-    params, state = jax.tree_map(f32_to_test_dtype, (params, state))
+    # Output dtype does not depend on batch size, so use the smallest batch.
+    # NOTE: All descriptors have the batch as their leading dimension.
+    x = jnp.ones((1,) + tuple(shape[1:]), dtype=jnp.float32)
+    params, state = init_fn(_RNG, x)
 
     # test_dtype in should result in test_dtype out.
-    x = x.astype(test_dtype)
+    x = lax.convert_element_type(x, test_dtype)
+
+    # Stateful modules are applied twice to check updated state keeps its dtype.
+    num_steps = 2 if state else 1
 
-    for _ in range(2):
-      y, state = apply_fn(params, state, rng, x)
+    allowed_nums = (_I32_NUM, jnp.dtype(test_dtype).num)
 
-      def assert_dtype(v):
-        if v.dtype != jnp.int32:
-          self.assertEqual(v.dtype, test_dtype)
+    # NOTE: `.dtype` is static so these assertions do not wait on the device.
+    ys, state = apply_fn(params, state, _RNG, x, num_steps)
+    dtypes = [v.dtype for v in jax.tree_leaves((ys, state))]
+    self.assertEmpty([d for d in dtypes if d.num not in allowed_nums])
 
-      jax.tree_map(assert_dtype, y)
-      jax.tree_map(assert_dtype, state)
+    # Wait once at the end so any runtime errors surface inside this test.
+    jax.tree_map(lambda v: v.block_until_ready(), (ys, state))
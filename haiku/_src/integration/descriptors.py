@@ -15,6 +15,7 @@
 # ==============================================================================
 """Module descriptors programatically describe how to use modules."""
 
+import itertools
 from typing import Any, Callable, NamedTuple, Union
 
 import haiku as hk
@@ -164,10 +165,20 @@ BATCH_MODULES = (
 )
 
 
+# NOTE: States are NumPy constants (not `jnp` arrays) so that creating them
+# while tracing (e.g. under `jax.jit`) does not cache a tracer.
+_IDENTITY_STATE_CACHE = {}
+
+
 class IdentityCore(hk.RNNCore):
 
   def initial_state(self, batch_size):
-    return jnp.ones([batch_size, 128, 1])
+    state = _IDENTITY_STATE_CACHE.get(batch_size)
+    if state is None:
+      state = np.ones([batch_size, 128, 1], dtype=np.float32)
+      state.setflags(write=False)
+      _IDENTITY_STATE_CACHE[batch_size] = state
+    return state
 
   def __call__(self, inputs, state):
     return inputs, state
@@ -180,7 +191,7 @@ class ResetCoreAdapter(Wrapped, hk.RNNCore):
 
   def __call__(self, inputs, state):
     t, b = inputs.shape
-    resets = np.broadcast_to(True, (t, b))
+    resets = jnp.broadcast_to(True, (t, b))
     return self.wrapped((inputs, resets), state)
 
 
@@ -225,29 +236,26 @@ def recurrent_factory(
 
 
 def unroll_descriptors(descriptors, unroller=None):
-  """Returns `Recurrent` wrapped descriptors with the given unroller applied."""
-  out = []
+  """Yields `Recurrent` wrapped descriptors with the given unroller applied."""
   for name, create, shape, dtype in descriptors:
     if unroller is None:
       name = "Recurrent({})".format(name)
     else:
       name = "Recurrent({}, {})".format(name, unroller.__name__)
-    out.append(
-        ModuleDescriptor(name=name,
-                         create=recurrent_factory(create, unroller),
-                         shape=shape,
-                         dtype=dtype))
-  return tuple(out)
+    yield ModuleDescriptor(name=name,
+                           create=recurrent_factory(create, unroller),
+                           shape=shape,
+                           dtype=dtype)
 
 
 # Modules that require time then batch input.
-RECURRENT_MODULES = (
-    unroll_descriptors(RNN_CORES, hk.dynamic_unroll) +
-    unroll_descriptors(RNN_CORES, hk.static_unroll))
+RECURRENT_MODULES = tuple(itertools.chain(
+    unroll_descriptors(RNN_CORES, hk.dynamic_unroll),
+    unroll_descriptors(RNN_CORES, hk.static_unroll)))
 
 ALL_MODULES = OPTIONAL_BATCH_MODULES + BATCH_MODULES + RECURRENT_MODULES
 
-IGNORED_MODULES = {
+IGNORED_MODULES = frozenset({
     # Stateless or abstract.
     hk.BatchApply,
     hk.Module,
@@ -265,4 +273,4 @@ IGNORED_MODULES = {
     # Recurrent.
     hk.DeepRNN,
     hk.RNNCore,
-}
+})